@@ -2,8 +2,6 @@ import asyncio
 import logging
 from pathlib import Path
 
-from apscheduler.schedulers.asyncio import AsyncIOScheduler
-
 from runpod_alerts_tg_bot.runpod_client import BalanceInfo
 
 from .alerts_service import AlertsService
@@ -18,17 +16,16 @@ def main() -> None:
     logger = logging.getLogger("run")
     logger.info("Starting RunPod alerts bot")
 
-    sender = TelegramSender(
-        bot_token=cfg.telegram_bot_token, chat_id=cfg.telegram_chat_id
-    )
+    from aiogram import Bot
+
+    # Alerts and command replies share one Bot, and with it one HTTP session
+    bot = Bot(token=cfg.telegram_bot_token)
+    sender = TelegramSender(bot, chat_id=cfg.telegram_chat_id)
     service = AlertsService(cfg, sender, state_path=Path("data/state.json"))
 
     async def get_balance_cb() -> BalanceInfo:
         return await service._fetch()
 
-    from aiogram import Bot
-
-    bot = Bot(token=cfg.telegram_bot_token)
     app = TelegramApp(
         bot,
         allowed_chat_id=cfg.telegram_chat_id,
@@ -37,17 +34,30 @@ def main() -> None:
     )
 
     async def run_all() -> None:
-        scheduler = AsyncIOScheduler()
-        service.schedule(scheduler)
-        scheduler.start()
+        await service.start()
 
-        await app.register_commands()
+        async def run_polling(jobs: asyncio.Task[None]) -> None:
+            try:
+                await app.register_commands()
+                await app.start_polling()
+            finally:
+                jobs.cancel()
+
+        # Cancellation reaches both tasks at once, so they tear down together
         try:
-            await app.start_polling()
+            async with asyncio.TaskGroup() as tg:
+                jobs = tg.create_task(service.run())
+                tg.create_task(run_polling(jobs))
         finally:
-            scheduler.shutdown(wait=False)
+            await service.aclose()
+            await bot.session.close()
 
     try:
-        asyncio.run(run_all())
+        try:
+            import uvloop
+        except ImportError:
+            asyncio.run(run_all())
+        else:
+            uvloop.run(run_all())
     except KeyboardInterrupt:
         logger.info("Shutting down...")
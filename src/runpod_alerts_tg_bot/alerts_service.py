@@ -1,14 +1,18 @@
-import json
+from __future__ import annotations
+
+import asyncio
 import logging
 import math
-from dataclasses import dataclass
+import os
+import time
+from dataclasses import asdict, dataclass, replace
 from datetime import UTC, datetime, timedelta
 from pathlib import Path
 
-from apscheduler.schedulers.asyncio import AsyncIOScheduler
-from apscheduler.triggers.cron import CronTrigger
+import orjson
 
 from .config import AppConfig
+from .formatting import format_eta, format_time_remaining
 from .runpod_client import BalanceInfo, RunpodClient
 from .telegram_bot import TelegramSender
 
@@ -51,6 +55,13 @@ BALANCE_DEPLETED_TEMPLATE = (
 )
 
 
+# Jobs that fire within this window share one RunPod response
+FETCH_CACHE_TTL_SEC = 2.0
+
+# Interval drift smaller than this is kept in memory until the next save
+INTERVAL_SAVE_STEP_MIN = 1.0
+
+
 @dataclass
 class AlertState:
     last_alert_at: float | None
@@ -58,23 +69,61 @@ class AlertState:
     alert_count: int
 
 
-def _now_ts() -> float:
-    return datetime.now(tz=UTC).timestamp()
-
-
 class AlertsService:
     def __init__(
-        self, cfg: AppConfig, sender: TelegramSender, state_path: Path
+        self,
+        cfg: AppConfig,
+        sender: TelegramSender,
+        state_path: Path,
+        runpod_client: RunpodClient | None = None,
     ) -> None:
         self._cfg = cfg
         self._sender = sender
         self._state_path = state_path
-        self._state = self._load_state()
+        self._runpod = runpod_client or RunpodClient(cfg.runpod_api_key)
+        self._state = self._initial_state()
+        self._saved_interval_min = self._state.current_interval_min
+        # Time of the previous poll; unset after a restart so downtime is not decayed
+        self._last_tick_at: float | None = None
+        # Holds at most the latest unsaved state; older snapshots are dropped
+        self._state_q: asyncio.Queue[AlertState] = asyncio.Queue(maxsize=1)
+        self._writer_task: asyncio.Task[None] | None = None
+        self._last_written_bytes: bytes | None = None
+        self._fetch_lock = asyncio.Lock()
+        self._fetch_cache: tuple[float, BalanceInfo] | None = None
 
-    def _load_state(self) -> AlertState:
+    async def start(self) -> None:
+        # One client for the service lifetime keeps the connection to RunPod alive
+        await self._runpod.__aenter__()
+        # Disk I/O runs off the event loop
+        loaded = await asyncio.to_thread(self._load_state)
+        if loaded is None:
+            self._state = self._initial_state()
+        else:
+            self._state = loaded
+            # The file already holds this state, so saving it again is skipped
+            self._last_written_bytes = orjson.dumps(asdict(loaded))
+        self._saved_interval_min = self._state.current_interval_min
+        self._writer_task = asyncio.create_task(self._state_writer_loop())
+
+    async def flush(self) -> None:
+        await self._state_q.join()
+
+    async def aclose(self) -> None:
+        if self._writer_task is not None:
+            await self.flush()
+            self._writer_task.cancel()
+            try:
+                await self._writer_task
+            except asyncio.CancelledError:
+                pass
+            self._writer_task = None
+        await self._runpod.__aexit__(None, None, None)
+
+    def _load_state(self) -> AlertState | None:
         if self._state_path.exists():
             try:
-                raw = json.loads(self._state_path.read_text())
+                raw = orjson.loads(self._state_path.read_bytes())
                 return AlertState(
                     last_alert_at=raw.get("last_alert_at"),
                     current_interval_min=float(
@@ -85,63 +134,111 @@ class AlertsService:
                 )
             except Exception:  # noqa: BLE001
                 logger.warning("Failed to read state, starting fresh")
+        return None
+
+    def _initial_state(self) -> AlertState:
         return AlertState(
             last_alert_at=None,
             current_interval_min=self._cfg.alert_initial_interval_minutes,
             alert_count=0,
         )
 
-    def _save_state(self) -> None:
-        data: dict = {
-            "last_alert_at": self._state.last_alert_at,
-            "current_interval_min": self._state.current_interval_min,
-            "alert_count": self._state.alert_count,
-        }
-        self._state_path.parent.mkdir(parents=True, exist_ok=True)
-        self._state_path.write_text(json.dumps(data))
+    def reset_state(self) -> None:
+        self._state = self._initial_state()
+        self._save_state()
 
-    async def _fetch(self) -> BalanceInfo:
-        async with RunpodClient(self._cfg.runpod_api_key) as client:
-            info = await client.fetch_balance()
-            return info
+    def _save_state(self) -> None:
+        # Only the latest state needs to reach disk, so replace any queued one
+        while not self._state_q.empty():
+            self._state_q.get_nowait()
+            self._state_q.task_done()
+        self._saved_interval_min = self._state.current_interval_min
+        self._state_q.put_nowait(replace(self._state))
 
-    @staticmethod
-    def _format_time_remaining(hours_left: float) -> str:
-        if math.isinf(hours_left):
-            return "∞"
+    async def _state_writer_loop(self) -> None:
+        while True:
+            state = await self._state_q.get()
+            try:
+                payload = orjson.dumps(asdict(state))
+                # Healthy polls keep re-saving the same reset state; skip those
+                if payload != self._last_written_bytes:
+                    await asyncio.to_thread(self._write_state, payload)
+                    self._last_written_bytes = payload
+            except Exception as e:  # noqa: BLE001
+                logger.error("Failed to save state: %s", e)
+            finally:
+                self._state_q.task_done()
 
-        days = int(hours_left // 24)
-        remaining_hours = hours_left % 24
+    def _write_state(self, payload: bytes) -> None:
+        self._state_path.parent.mkdir(parents=True, exist_ok=True)
+        # Write a sibling file and swap it in so readers never see a partial file
+        tmp_path = self._state_path.with_suffix(".json.tmp")
+        tmp_path.write_bytes(payload)
+        os.replace(tmp_path, self._state_path)
 
-        if days > 0:
-            return f"{days}d {remaining_hours:.1f}h"
-        return f"{remaining_hours:.1f}h"
+    def _decay_interval(self, prev_tick_at: float | None, now_ts: float) -> None:
+        # While an alert episode is active the interval shrinks with elapsed time,
+        # by alert_decay_factor over each interval's worth of minutes
+        state = self._state
+        cfg = self._cfg
+        min_interval = cfg.alert_minimum_interval_minutes
+        if (
+            prev_tick_at is None
+            or state.last_alert_at is None
+            or state.current_interval_min <= min_interval
+        ):
+            return
+        elapsed_min = (now_ts - prev_tick_at) / 60.0
+        if elapsed_min <= 0:
+            return
+        decay = cfg.alert_decay_factor ** (elapsed_min / state.current_interval_min)
+        state.current_interval_min = max(
+            min_interval, state.current_interval_min * decay
+        )
+        if (
+            self._saved_interval_min - state.current_interval_min
+            >= INTERVAL_SAVE_STEP_MIN
+            or state.current_interval_min == min_interval
+        ):
+            self._save_state()
 
-    @staticmethod
-    def _format_eta(hours_left: float) -> str:
-        if math.isinf(hours_left):
-            return "∞"
-        dt = datetime.now(tz=UTC) + timedelta(hours=hours_left)
-        return dt.strftime("%Y-%m-%d %H:%M UTC")
+    async def _fetch(self) -> BalanceInfo:
+        # Concurrent callers queue on the lock and reuse the in-flight result
+        async with self._fetch_lock:
+            cached = self._fetch_cache
+            if (
+                cached is not None
+                and time.monotonic() - cached[0] < FETCH_CACHE_TTL_SEC
+            ):
+                return cached[1]
+            info = await self._runpod.fetch_balance()
+            self._fetch_cache = (time.monotonic(), info)
+            return info
 
-    def _format_hours_left(self, balance: float, spend_per_hr: float) -> float:
+    def _format_hours_left(
+        self, balance: float, spend_per_hr: float, stop_balance: float
+    ) -> float:
         if spend_per_hr <= 0:
             return math.inf
-        return (balance - self._cfg.pod_stop_balance_usd) / spend_per_hr
+        return (balance - stop_balance) / spend_per_hr
 
     async def send_daily(self) -> None:
         info = await self._fetch()
+        now = datetime.now(tz=UTC)
+        stop_balance = self._cfg.pod_stop_balance_usd
         balance = info.client_balance
         spend = info.current_spend_per_hr
-        hours_left = self._format_hours_left(balance, spend)
-        time_remaining = self._format_time_remaining(hours_left)
-        eta = self._format_eta(hours_left)
-        text = DAILY_BALANCE_TEMPLATE.format(
-            balance=balance,
-            spend=spend,
-            pod_stop_balance=self._cfg.pod_stop_balance_usd,
-            time_remaining=time_remaining,
-            eta=eta,
+        hours_left = self._format_hours_left(balance, spend, stop_balance)
+        time_remaining = format_time_remaining(hours_left)
+        eta = format_eta(hours_left, now)
+        text = DAILY_BALANCE_TEMPLATE.format_map(
+            {
+                "balance": balance,
+                "spend": spend,
+                "pod_stop_balance": stop_balance,
+                "time_remaining": time_remaining,
+                "eta": eta,
+            }
         )
         try:
             await self._sender.send_message(text, disable_notification=True)
@@ -151,108 +248,53 @@ class AlertsService:
 
     async def poll_and_alert(self) -> None:
         info = await self._fetch()
+        # One clock read per tick keeps elapsed time, ETA and state in agreement
+        now = datetime.now(tz=UTC)
+        now_ts = now.timestamp()
         balance = info.client_balance
         spend = info.current_spend_per_hr
-        hours_left = self._format_hours_left(balance, spend)
-
-        threshold = self._cfg.low_balance_usd
-        hysteresis = self._cfg.alert_hysteresis_usd
-
-        # Special case: spend is zero (pods stopped)
-        if math.isinf(hours_left):
-            # If balance is low/negative and spend is zero, pods were shut down
-            if balance < threshold:
-                should_send = False
-                if self._state.last_alert_at is None:
-                    should_send = True
-                else:
-                    elapsed_min = (_now_ts() - self._state.last_alert_at) / 60.0
-                    if elapsed_min >= self._state.current_interval_min:
-                        should_send = True
-
-                if should_send:
-                    text = BALANCE_DEPLETED_TEMPLATE.format(
-                        balance=balance,
-                        threshold=threshold,
-                        pod_stop_balance=self._cfg.pod_stop_balance_usd,
-                    )
-                    try:
-                        await self._sender.send_message(text)
-                        logger.info("Sent balance depleted alert")
-                        # Update state only after successful send
-                        self._state.last_alert_at = _now_ts()
-                        # decrease the interval multiplicatively down to min interval
-                        self._state.current_interval_min = max(
-                            self._cfg.alert_minimum_interval_minutes,
-                            self._state.current_interval_min
-                            * self._cfg.alert_decay_factor,
-                        )
-                        self._state.alert_count += 1
-                        self._save_state()
-                    except Exception as e:  # noqa: BLE001
-                        logger.error("Failed to send balance depleted alert: %s", e)
-                        # State is NOT updated - will retry on next poll
-            elif balance >= threshold + hysteresis:
-                # Balance recovered (recharged) but pods not yet running
-                if self._state.alert_count > 0:
-                    text = BALANCE_RECOVERED_TEMPLATE.format(
-                        balance=balance, recovery_threshold=threshold + hysteresis
-                    )
-                    try:
-                        await self._sender.send_message(text, disable_notification=True)
-                        logger.info("Sent balance recovered message")
-                    except Exception as e:  # noqa: BLE001
-                        logger.error("Failed to send balance recovered message: %s", e)
-                # Reset state regardless of message delivery
-                self._state = AlertState(
-                    last_alert_at=None,
-                    current_interval_min=self._cfg.alert_initial_interval_minutes,
-                    alert_count=0,
-                )
-                self._save_state()
-            # If balance is OK and spend is zero, just skip (no active pods)
-            return
+
+        cfg = self._cfg
+        threshold = cfg.low_balance_usd
+        hysteresis = cfg.alert_hysteresis_usd
+        stop_balance = cfg.pod_stop_balance_usd
+        hours_left = self._format_hours_left(balance, spend, stop_balance)
+
+        # Advance on every poll so only time spent below the threshold decays
+        prev_tick_at = self._last_tick_at
+        self._last_tick_at = now_ts
 
         if balance < threshold:
-            should_send = False
-            if self._state.last_alert_at is None:
-                should_send = True
+            self._decay_interval(prev_tick_at, now_ts)
+            if not self._alert_due(now_ts):
+                return
+            # Zero spend while below the threshold means the pods were shut down
+            if math.isinf(hours_left):
+                text = BALANCE_DEPLETED_TEMPLATE.format_map(
+                    {
+                        "balance": balance,
+                        "threshold": threshold,
+                        "pod_stop_balance": stop_balance,
+                    }
+                )
+                await self._send_alert(text, "balance depleted alert", now_ts)
             else:
-                elapsed_min = (_now_ts() - self._state.last_alert_at) / 60.0
-                if elapsed_min >= self._state.current_interval_min:
-                    should_send = True
-
-            if should_send:
-                time_remaining = self._format_time_remaining(hours_left)
-                eta = self._format_eta(hours_left)
-                text = LOW_BALANCE_ALERT_TEMPLATE.format(
-                    balance=balance,
-                    threshold=threshold,
-                    spend=spend,
-                    pod_stop_balance=self._cfg.pod_stop_balance_usd,
-                    time_remaining=time_remaining,
-                    eta=eta,
+                text = LOW_BALANCE_ALERT_TEMPLATE.format_map(
+                    {
+                        "balance": balance,
+                        "threshold": threshold,
+                        "spend": spend,
+                        "pod_stop_balance": stop_balance,
+                        "time_remaining": format_time_remaining(hours_left),
+                        "eta": format_eta(hours_left, now),
+                    }
                 )
-                try:
-                    await self._sender.send_message(text)
-                    logger.info("Sent low balance alert")
-                    # Update state only after successful send
-                    self._state.last_alert_at = _now_ts()
-                    # decrease the interval multiplicatively down to min interval
-                    self._state.current_interval_min = max(
-                        self._cfg.alert_minimum_interval_minutes,
-                        self._state.current_interval_min * self._cfg.alert_decay_factor,
-                    )
-                    self._state.alert_count += 1
-                    self._save_state()
-                except Exception as e:  # noqa: BLE001
-                    logger.error("Failed to send low balance alert: %s", e)
-                    # State is NOT updated - will retry on next poll
+                await self._send_alert(text, "low balance alert", now_ts)
         elif balance >= threshold + hysteresis:
-            # reset
+            # reset, whether or not pods are running again
             if self._state.alert_count > 0:
-                text = BALANCE_RECOVERED_TEMPLATE.format(
-                    balance=balance, recovery_threshold=threshold + hysteresis
+                text = BALANCE_RECOVERED_TEMPLATE.format_map(
+                    {"balance": balance, "recovery_threshold": threshold + hysteresis}
                 )
                 try:
                     await self._sender.send_message(text, disable_notification=True)
@@ -260,25 +302,58 @@ class AlertsService:
                 except Exception as e:  # noqa: BLE001
                     logger.error("Failed to send balance recovered message: %s", e)
             # Reset state regardless of message delivery
-            self._state = AlertState(
-                last_alert_at=None,
-                current_interval_min=self._cfg.alert_initial_interval_minutes,
-                alert_count=0,
-            )
-            self._save_state()
+            self.reset_state()
 
-    def schedule(self, scheduler: AsyncIOScheduler) -> None:
-        tz = self._cfg.get_daily_notify_tz()
+    def _alert_due(self, now_ts: float) -> bool:
+        if self._state.last_alert_at is None:
+            return True
+        elapsed_min = (now_ts - self._state.last_alert_at) / 60.0
+        return elapsed_min >= self._state.current_interval_min
+
+    async def _send_alert(self, text: str, label: str, now_ts: float) -> bool:
+        try:
+            await self._sender.send_message(text)
+        except Exception as e:  # noqa: BLE001
+            logger.error("Failed to send %s: %s", label, e)
+            # State is NOT updated - will retry on next poll
+            return False
+        logger.info("Sent %s", label)
+        # Update state only after successful send
+        self._state.last_alert_at = now_ts
+        self._state.alert_count += 1
+        self._save_state()
+        return True
+
+    def _next_daily_at(self, after: datetime) -> datetime:
         notify_time = self._cfg.get_daily_notify_time()
-        cron = CronTrigger(
-            hour=notify_time.hour,
-            minute=notify_time.minute,
-            timezone=tz,
-        )
-        scheduler.add_job(self.send_daily, cron, id="daily_balance")
-        scheduler.add_job(
-            self.poll_and_alert,
-            "interval",
-            seconds=self._cfg.poll_interval_sec,
-            id="poll_alerts",
+        next_fire = after.replace(
+            hour=notify_time.hour, minute=notify_time.minute, second=0, microsecond=0
         )
+        if next_fire <= after:
+            next_fire += timedelta(days=1)
+        return next_fire
+
+    async def _daily_loop(self) -> None:
+        tz = self._cfg.get_daily_notify_tz()
+        next_fire = self._next_daily_at(datetime.now(tz=tz))
+        while True:
+            # Compare epoch timestamps: aware datetimes sharing a zone subtract as
+            # wall-clock times, which is off by an hour across DST changes
+            await asyncio.sleep(max(0.0, next_fire.timestamp() - time.time()))
+            try:
+                await self.send_daily()
+            except Exception as e:  # noqa: BLE001
+                logger.error("Daily balance report failed: %s", e)
+            # Never schedule at or before the run that just fired, even if woken early
+            next_fire = self._next_daily_at(max(next_fire, datetime.now(tz=tz)))
+
+    async def _poll_loop(self) -> None:
+        while True:
+            try:
+                await self.poll_and_alert()
+            except Exception as e:  # noqa: BLE001
+                logger.error("Balance poll failed: %s", e)
+            await asyncio.sleep(self._cfg.poll_interval_sec)
+
+    async def run(self) -> None:
+        await asyncio.gather(self._poll_loop(), self._daily_loop())
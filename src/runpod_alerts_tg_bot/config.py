@@ -1,7 +1,8 @@
 from datetime import time
+from typing import Any
 from zoneinfo import ZoneInfo
 
-from pydantic import Field, field_validator
+from pydantic import Field, PrivateAttr, field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -16,7 +17,9 @@ class AppConfig(BaseSettings):
     daily_notify_time: str = "12:00"
     daily_notify_tz: str = "UTC"
     low_balance_usd: float = -1700.0
-    pod_stop_balance_usd: float = -2000
+    pod_stop_balance_usd: float = -2000.0
+    # The alert interval starts here and, from the first alert on, shrinks with
+    # elapsed time by alert_decay_factor per interval, down to the minimum
     alert_initial_interval_minutes: float = 120.0
     alert_decay_factor: float = 0.5
     alert_minimum_interval_minutes: float = 15.0
@@ -24,19 +27,27 @@ class AppConfig(BaseSettings):
     poll_interval_sec: float = 300.0
     log_level: str = Field(default="INFO")
 
+    # Parsed once from the fields above; config does not change at runtime
+    _notify_time: time = PrivateAttr()
+    _notify_tz: ZoneInfo = PrivateAttr()
+
     @field_validator("log_level")
     @classmethod
     def uppercase_log_level(cls, v: str) -> str:
         return v.upper()
 
-    def get_daily_notify_time(self) -> time:
+    def model_post_init(self, context: Any) -> None:
         parts = self.daily_notify_time.split(":")
         hour = int(parts[0])
         minute = int(parts[1]) if len(parts) > 1 else 0
-        return time(hour=hour, minute=minute)
+        self._notify_time = time(hour=hour, minute=minute)
+        self._notify_tz = ZoneInfo(self.daily_notify_tz)
+
+    def get_daily_notify_time(self) -> time:
+        return self._notify_time
 
     def get_daily_notify_tz(self) -> ZoneInfo:
-        return ZoneInfo(self.daily_notify_tz)
+        return self._notify_tz
 
 
 def load_config() -> AppConfig:
@@ -0,0 +1,26 @@
+import math
+from datetime import UTC, datetime, timedelta
+
+
+def format_time_remaining(hours_left: float) -> str:
+    if math.isinf(hours_left):
+        return "∞"
+
+    days = int(hours_left // 24)
+    remaining_hours = hours_left % 24
+
+    if days > 0:
+        return f"{days}d {remaining_hours:.1f}h"
+    return f"{remaining_hours:.1f}h"
+
+
+def format_eta(hours_left: float, now: datetime | None = None) -> str:
+    if math.isinf(hours_left):
+        return "∞"
+    if now is None:
+        now = datetime.now(tz=UTC)
+    dt = now + timedelta(hours=hours_left)
+    # Fixed format, so skip the locale-aware strftime machinery
+    return (
+        f"{dt.year:04d}-{dt.month:02d}-{dt.day:02d} {dt.hour:02d}:{dt.minute:02d} UTC"
+    )
@@ -5,6 +5,7 @@ import logging
 from dataclasses import dataclass
 
 import httpx
+import orjson
 
 logger = logging.getLogger(__name__)
 
@@ -14,6 +15,15 @@ RUNPOD_GRAPHQL_URL = "https://api.runpod.io/graphql"
 
 MYSELF_QUERY = "query MyselfBalance { myself { clientBalance currentSpendPerHr } }"
 
+# Attempts per fetch, covering connect, status, timeout and GraphQL errors.
+# Each attempt is bounded by the 10 s connect and 15 s read timeouts, so with
+# the 1 s + 2 s backoff a fetch gives up after at most ~78 s (~33 s when the
+# host is unreachable).
+FETCH_ATTEMPTS = 3
+
+# The query never changes, so encode the request body once
+MYSELF_BODY_BYTES = orjson.dumps({"query": MYSELF_QUERY})
+
 
 @dataclass(frozen=True)
 class BalanceInfo:
@@ -30,6 +40,14 @@ class RunpodClient:
         self._client = httpx.AsyncClient(
             headers={"Authorization": f"Bearer {self._api_key}"},
             timeout=httpx.Timeout(15.0, connect=10.0),
+            # All traffic goes to a single GraphQL host, so one multiplexed
+            # connection kept alive between polls is enough
+            http2=True,
+            limits=httpx.Limits(
+                max_keepalive_connections=1,
+                max_connections=4,
+                keepalive_expiry=600.0,
+            ),
         )
         return self
 
@@ -38,37 +56,33 @@ class RunpodClient:
             await self._client.aclose()
             self._client = None
 
-    async def _ensure_client(self) -> httpx.AsyncClient:
-        if self._client is None:
-            self._client = httpx.AsyncClient(
-                headers={"Authorization": f"Bearer {self._api_key}"},
-                timeout=httpx.Timeout(15.0, connect=10.0),
-            )
-        return self._client
-
     async def fetch_balance(self) -> BalanceInfo:
-        client = await self._ensure_client()
-        for attempt in range(3):
+        client = self._client
+        if client is None:
+            raise RuntimeError("RunpodClient is not open, use 'async with'")
+        for attempt in range(FETCH_ATTEMPTS - 1):
             try:
-                response = await client.post(
-                    url=RUNPOD_GRAPHQL_URL,
-                    json={"query": MYSELF_QUERY},
-                )
-                response.raise_for_status()
-                payload = response.json()
-                if "errors" in payload:
-                    raise RuntimeError(str(payload["errors"]))
-                data = payload.get("data", {})
-                myself = data.get("myself", {})
-                balance = float(myself.get("clientBalance") or 0.0)
-                spend = float(myself.get("currentSpendPerHr") or 0.0)
-                return BalanceInfo(client_balance=balance, current_spend_per_hr=spend)
+                return await self._request_balance(client)
             except Exception as e:  # noqa: BLE001
-                wait = 2**attempt
                 logger.warning("RunPod fetch attempt %s failed: %s", attempt + 1, e)
-                if attempt == 2:
-                    raise
-                await asyncio.sleep(wait)
-
-        # Unreachable due to raise above
-        return BalanceInfo(client_balance=0.0, current_spend_per_hr=0.0)
+                await asyncio.sleep(2**attempt)
+        # Last attempt: let the error reach the caller
+        return await self._request_balance(client)
+
+    async def _request_balance(self, client: httpx.AsyncClient) -> BalanceInfo:
+        response = await client.post(
+            url=RUNPOD_GRAPHQL_URL,
+            content=MYSELF_BODY_BYTES,
+            headers={"content-type": "application/json"},
+        )
+        response.raise_for_status()
+        payload = orjson.loads(response.content)
+        if "errors" in payload:
+            raise RuntimeError(str(payload["errors"]))
+        try:
+            myself = payload["data"]["myself"]
+            balance = float(myself["clientBalance"] or 0.0)
+            spend = float(myself["currentSpendPerHr"] or 0.0)
+        except (KeyError, TypeError) as e:
+            raise RuntimeError(f"malformed response: {payload!r}") from e
+        return BalanceInfo(client_balance=balance, current_spend_per_hr=spend)
@@ -1,13 +1,13 @@
 from __future__ import annotations
 
 import logging
-import math
-from datetime import UTC, datetime, timedelta
 
 from aiogram import Bot, Dispatcher
 from aiogram.filters import Command
 from aiogram.types import Message
 
+from .formatting import format_eta, format_time_remaining
+
 logger = logging.getLogger(__name__)
 
 
@@ -29,28 +29,9 @@ BALANCE_COMMAND_INFINITE_TEMPLATE = (
 )
 
 
-def _format_time_remaining(hours_left: float) -> str:
-    if math.isinf(hours_left):
-        return "∞"
-
-    days = int(hours_left // 24)
-    remaining_hours = hours_left % 24
-
-    if days > 0:
-        return f"{days}d {remaining_hours:.1f}h"
-    return f"{remaining_hours:.1f}h"
-
-
-def _format_eta(hours_left: float) -> str:
-    if math.isinf(hours_left):
-        return "∞"
-    dt = datetime.now(tz=UTC) + timedelta(hours=hours_left)
-    return dt.strftime("%Y-%m-%d %H:%M UTC")
-
-
 class TelegramSender:
-    def __init__(self, bot_token: str, chat_id: str) -> None:
-        self._bot = Bot(token=bot_token)
+    def __init__(self, bot: Bot, chat_id: str) -> None:
+        self._bot = bot
         self._chat_id = chat_id
 
     async def send_message(self, text: str, disable_notification: bool = False) -> None:
@@ -89,19 +70,24 @@ class TelegramApp:
                 balance = info.client_balance
                 spend = info.current_spend_per_hr
                 if spend <= 0:
-                    text = BALANCE_COMMAND_INFINITE_TEMPLATE.format(
-                        balance=balance, pod_stop_balance=self._pod_stop_balance_usd
+                    text = BALANCE_COMMAND_INFINITE_TEMPLATE.format_map(
+                        {
+                            "balance": balance,
+                            "pod_stop_balance": self._pod_stop_balance_usd,
+                        }
                     )
                 else:
                     hours_left = (balance - self._pod_stop_balance_usd) / spend
-                    time_remaining = _format_time_remaining(hours_left)
-                    eta = _format_eta(hours_left)
-                    text = BALANCE_COMMAND_TEMPLATE.format(
-                        balance=balance,
-                        spend=spend,
-                        pod_stop_balance=self._pod_stop_balance_usd,
-                        time_remaining=time_remaining,
-                        eta=eta,
+                    time_remaining = format_time_remaining(hours_left)
+                    eta = format_eta(hours_left)
+                    text = BALANCE_COMMAND_TEMPLATE.format_map(
+                        {
+                            "balance": balance,
+                            "spend": spend,
+                            "pod_stop_balance": self._pod_stop_balance_usd,
+                            "time_remaining": time_remaining,
+                            "eta": eta,
+                        }
                     )
                 await self._bot.send_message(
                     message.chat.id,